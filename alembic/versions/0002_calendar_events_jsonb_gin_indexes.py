@@ -0,0 +1,44 @@
+"""add GIN indexes on calendar_events JSONB columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# jsonb_path_ops only supports containment (@>) but yields much smaller indexes than jsonb_ops.
+_GIN_COLUMNS = ("extended_properties", "google", "microsoft", "attendees")
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for column in _GIN_COLUMNS:
+            op.create_index(
+                f"ix_calendar_events_{column}_gin",
+                "calendar_events",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "jsonb_path_ops"},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in reversed(_GIN_COLUMNS):
+            op.drop_index(
+                f"ix_calendar_events_{column}_gin",
+                table_name="calendar_events",
+                postgresql_concurrently=True,
+            )
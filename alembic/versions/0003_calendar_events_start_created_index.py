@@ -0,0 +1,34 @@
+"""replace start_at index with one matching the list ordering
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Matches ORDER BY start_at ASC NULLS LAST, created_at DESC used by /api/events and the ICS feed,
+    # so LIMIT queries walk the index instead of sorting. Also serves plain start_at range scans.
+    op.create_index(
+        "ix_calendar_events_start_created",
+        "calendar_events",
+        [sa.text("start_at ASC NULLS LAST"), sa.text("created_at DESC")],
+    )
+    op.drop_index("ix_calendar_events_start_at", table_name="calendar_events")
+
+
+def downgrade() -> None:
+    op.create_index("ix_calendar_events_start_at", "calendar_events", ["start_at"])
+    op.drop_index("ix_calendar_events_start_created", table_name="calendar_events")
@@ -0,0 +1,36 @@
+"""make calendar_events.ical_uid unique when present
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial so events without a UID are unaffected; also the arbiter for ON CONFLICT (ical_uid).
+    # Fails if duplicate UIDs already exist; resolve those first.
+    op.drop_index("ix_calendar_events_ical_uid", table_name="calendar_events")
+    op.create_index(
+        "ix_calendar_events_ical_uid",
+        "calendar_events",
+        ["ical_uid"],
+        unique=True,
+        postgresql_where=sa.text("ical_uid IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_calendar_events_ical_uid", table_name="calendar_events")
+    op.create_index("ix_calendar_events_ical_uid", "calendar_events", ["ical_uid"])
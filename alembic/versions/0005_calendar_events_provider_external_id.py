@@ -0,0 +1,39 @@
+"""replace provider/external_id indexes with one unique composite
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Sync looks events up by (provider, external_id): one index probe instead of a BitmapAnd
+    # of two single-column indexes. Nothing filters on provider alone, so that index goes too.
+    # Fails if duplicate provider event ids already exist; resolve those first.
+    op.create_index(
+        "ix_calendar_events_provider_external_id",
+        "calendar_events",
+        ["provider", "external_id"],
+        unique=True,
+        postgresql_where=sa.text("external_id IS NOT NULL"),
+    )
+    op.drop_index("ix_calendar_events_external_id", table_name="calendar_events")
+    op.drop_index("ix_calendar_events_provider", table_name="calendar_events")
+
+
+def downgrade() -> None:
+    op.create_index("ix_calendar_events_provider", "calendar_events", ["provider"])
+    op.create_index("ix_calendar_events_external_id", "calendar_events", ["external_id"])
+    op.drop_index("ix_calendar_events_provider_external_id", table_name="calendar_events")
@@ -0,0 +1,44 @@
+"""add GIN indexes on calendar_events organizer and categories
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_calendar_events_organizer_gin",
+            "calendar_events",
+            ["organizer"],
+            postgresql_using="gin",
+            postgresql_ops={"organizer": "jsonb_path_ops"},
+            postgresql_concurrently=True,
+        )
+        # categories is text[]; the default array_ops class serves @> and &&.
+        op.create_index(
+            "ix_calendar_events_categories_gin",
+            "calendar_events",
+            ["categories"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_calendar_events_categories_gin", table_name="calendar_events", postgresql_concurrently=True)
+        op.drop_index("ix_calendar_events_organizer_gin", table_name="calendar_events", postgresql_concurrently=True)
@@ -0,0 +1,32 @@
+"""add partial index on calendar_events.series_master_id
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Looking up a series' occurrences by their master; partial since most events have none.
+    op.create_index(
+        "ix_calendar_events_series_master",
+        "calendar_events",
+        ["series_master_id"],
+        postgresql_where=sa.text("series_master_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_calendar_events_series_master", table_name="calendar_events")
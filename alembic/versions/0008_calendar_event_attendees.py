@@ -0,0 +1,95 @@
+"""add calendar_event_attendees, kept in sync from calendar_events.attendees
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# One row per object in `{event}.attendees` (NULL / non-array yields none). Accepts both provider
+# shapes: Google {email, responseStatus, organizer} and MS Graph {emailAddress: {address}, status: {response}}.
+_ATTENDEE_ROWS = """
+    SELECT {event}.id,
+           COALESCE(a->>'email', a->'emailAddress'->>'address'),
+           COALESCE(a->>'responseStatus', a->'status'->>'response'),
+           COALESCE(a->>'organizer' = 'true', false)
+      FROM {tables}jsonb_array_elements(
+               CASE WHEN jsonb_typeof({event}.attendees) = 'array' THEN {event}.attendees END
+           ) AS a
+     WHERE jsonb_typeof(a) = 'object'
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "calendar_event_attendees",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "event_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("calendar_events.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("email", sa.String(length=320), nullable=True),
+        sa.Column("response_status", sa.String(length=32), nullable=True),
+        sa.Column("is_organizer", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    # "My meetings": email lookup, then join to calendar_events without touching JSONB.
+    op.create_index("ix_calendar_event_attendees_email_event", "calendar_event_attendees", ["email", "event_id"])
+    # Trigger resync and ON DELETE CASCADE look rows up by event.
+    op.create_index("ix_calendar_event_attendees_event_id", "calendar_event_attendees", ["event_id"])
+
+    # Writes reach calendar_events via ORM, Core INSERT/UPDATE ... RETURNING and COPY + upsert,
+    # so the flattening lives in the database rather than in one Python code path.
+    op.execute(
+        f"""
+        CREATE FUNCTION calendar_events_sync_attendees() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                IF NEW.attendees IS NOT DISTINCT FROM OLD.attendees THEN
+                    RETURN NULL;
+                END IF;
+                DELETE FROM calendar_event_attendees WHERE event_id = NEW.id;
+            END IF;
+            INSERT INTO calendar_event_attendees (event_id, email, response_status, is_organizer)
+            {_ATTENDEE_ROWS.format(event="NEW", tables="")};
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER calendar_events_sync_attendees
+        AFTER INSERT OR UPDATE OF attendees ON calendar_events
+        FOR EACH ROW EXECUTE FUNCTION calendar_events_sync_attendees()
+        """
+    )
+
+    # Backfill existing events.
+    op.execute(
+        "INSERT INTO calendar_event_attendees (event_id, email, response_status, is_organizer)"
+        + _ATTENDEE_ROWS.format(event="e", tables="calendar_events AS e, ")
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER calendar_events_sync_attendees ON calendar_events")
+    op.execute("DROP FUNCTION calendar_events_sync_attendees()")
+    op.drop_index("ix_calendar_event_attendees_event_id", table_name="calendar_event_attendees")
+    op.drop_index("ix_calendar_event_attendees_email_event", table_name="calendar_event_attendees")
+    op.drop_table("calendar_event_attendees")
@@ -0,0 +1,29 @@
+"""default calendar_events created_at/updated_at to now() server-side
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Metadata-only change; existing rows keep their values.
+    op.alter_column("calendar_events", "created_at", server_default=sa.func.now())
+    op.alter_column("calendar_events", "updated_at", server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    op.alter_column("calendar_events", "updated_at", server_default=None)
+    op.alter_column("calendar_events", "created_at", server_default=None)
@@ -0,0 +1,51 @@
+"""fold rarely-read calendar_events JSONB columns into one `extra` document
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match src.models._EXTRA_KEYS. The GIN-indexed JSONB columns (attendees, organizer,
+# google, microsoft, extended_properties) stay as columns.
+_EXTRA_COLUMNS = ("location_details", "creator", "reminders", "conference_data", "source")
+
+
+def upgrade() -> None:
+    op.add_column("calendar_events", sa.Column("extra", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    # Only non-null values become keys; rows with none of them keep extra NULL.
+    pairs = ", ".join(f"'{c}', {c}" for c in _EXTRA_COLUMNS)
+    op.execute(
+        f"""
+        UPDATE calendar_events
+           SET extra = (
+                   SELECT jsonb_object_agg(key, value)
+                     FROM jsonb_each(jsonb_build_object({pairs}))
+                    WHERE value <> 'null'::jsonb
+               )
+         WHERE num_nonnulls({", ".join(_EXTRA_COLUMNS)}) > 0
+        """
+    )
+    for c in _EXTRA_COLUMNS:
+        op.drop_column("calendar_events", c)
+
+
+def downgrade() -> None:
+    for c in _EXTRA_COLUMNS:
+        op.add_column("calendar_events", sa.Column(c, postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    assignments = ", ".join(f"{c} = NULLIF(extra->'{c}', 'null'::jsonb)" for c in _EXTRA_COLUMNS)
+    op.execute(f"UPDATE calendar_events SET {assignments} WHERE extra IS NOT NULL")
+    op.drop_column("calendar_events", "extra")
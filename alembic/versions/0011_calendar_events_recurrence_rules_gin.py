@@ -0,0 +1,37 @@
+"""add GIN index on calendar_events.recurrence_rules
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # text[] with the default array_ops class: serves recurrence_rules @> / && on whole rule strings.
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_calendar_events_recurrence_rules_gin",
+            "calendar_events",
+            ["recurrence_rules"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_calendar_events_recurrence_rules_gin", table_name="calendar_events", postgresql_concurrently=True
+        )
@@ -0,0 +1,42 @@
+"""store missing calendar_events JSONB values as SQL NULL, not JSON null
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_JSONB_COLUMNS = (
+    "organizer",
+    "attendees",
+    "recurrence",
+    "attachments",
+    "google",
+    "microsoft",
+    "extended_properties",
+    "extra",
+)
+
+
+def upgrade() -> None:
+    # Small-batch bulk inserts bound None as 'null'::jsonb; the COPY path and the model
+    # (none_as_null=True) write SQL NULL. Normalize so both read the same.
+    assignments = ", ".join(f"{c} = NULLIF({c}, 'null'::jsonb)" for c in _JSONB_COLUMNS)
+    matches = " OR ".join(f"{c} = 'null'::jsonb" for c in _JSONB_COLUMNS)
+    op.execute(f"UPDATE calendar_events SET {assignments} WHERE {matches}")
+
+
+def downgrade() -> None:
+    # Data-only normalization; SQL NULL is valid under the previous code too.
+    pass
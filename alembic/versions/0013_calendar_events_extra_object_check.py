@@ -0,0 +1,32 @@
+"""constrain calendar_events.extra to NULL or a JSON object
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # JSON null left behind by earlier small-batch bulk inserts is handled by 0012; any other
+    # non-object value was never written by the app and makes this fail loudly instead.
+    op.execute("UPDATE calendar_events SET extra = NULL WHERE extra = 'null'::jsonb")
+    op.create_check_constraint(
+        "ck_calendar_events_extra_object",
+        "calendar_events",
+        "extra IS NULL OR jsonb_typeof(extra) = 'object'",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_calendar_events_extra_object", "calendar_events", type_="check")
@@ -0,0 +1,43 @@
+"""scope the unique calendar_events.ical_uid index to rows without an external_id
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Provider-synced rows (external_id set) are keyed by (provider, external_id) instead:
+    # occurrences of a recurring provider event share one iCalUID.
+    op.drop_index("ix_calendar_events_ical_uid", table_name="calendar_events")
+    op.create_index(
+        "ix_calendar_events_ical_uid",
+        "calendar_events",
+        ["ical_uid"],
+        unique=True,
+        postgresql_where=sa.text("ical_uid IS NOT NULL AND external_id IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    # Back to the 0004 index. Fails if provider-synced rows share a UID; resolve those first.
+    op.drop_index("ix_calendar_events_ical_uid", table_name="calendar_events")
+    op.create_index(
+        "ix_calendar_events_ical_uid",
+        "calendar_events",
+        ["ical_uid"],
+        unique=True,
+        postgresql_where=sa.text("ical_uid IS NOT NULL"),
+    )
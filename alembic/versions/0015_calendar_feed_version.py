@@ -0,0 +1,28 @@
+"""add calendar_feed_version sequence for ICS feed cache validation
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0015"
+down_revision: Union[str, None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A sequence rather than a counter row: nextval takes no row lock, so concurrent writers
+    # (e.g. a long bulk import and a PATCH) never queue on it.
+    op.execute(sa.schema.CreateSequence(sa.Sequence("calendar_feed_version")))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence("calendar_feed_version")))
@@ -1,42 +1,157 @@
 import os
 
 import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import UTC, datetime
+from typing import Any, Iterator
 from urllib.parse import urlencode
 
-from flask import Flask, Response, jsonify, redirect, render_template, request
+import msgspec
+from flask import Flask, Response, redirect, render_template, request
+from psycopg.errors import UniqueViolation
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from werkzeug.http import http_date
 
-from src.db import get_engine, get_session
-from src.ics import calendar_event_to_ics_event, render_calendar_ics
-from src.models import CalendarEvent
+from src.bulk import bulk_insert_events
+from src.db import get_engine, get_session, json_dumps
+from src.ics import calendar_event_to_ics_event, iter_calendar_ics
+from src.models import FEED_VERSION, FEED_VERSION_VALUE, CalendarEvent
+
+# Columns read by calendar_event_to_ics_event; the feed never needs the JSONB payloads.
+# Selected via Core, so no ORM identity map or instrumentation for a read-only feed.
+_ICS_COLS = (
+    CalendarEvent.id,
+    CalendarEvent.ical_uid,
+    CalendarEvent.updated_at,
+    CalendarEvent.created_at,
+    CalendarEvent.title,
+    CalendarEvent.description,
+    CalendarEvent.location,
+    CalendarEvent.status,
+    CalendarEvent.transparency,
+    CalendarEvent.html_link,
+    CalendarEvent.web_link,
+    CalendarEvent.start_at,
+    CalendarEvent.end_at,
+    CalendarEvent.is_all_day,
+    CalendarEvent.recurrence_rules,
+)
+
+# Rendered ICS bodies keyed by (etag, limit). The ETag changes whenever any event
+# is added/updated/removed (see FEED_VERSION), so entries never go stale; old versions just age out.
+_ICS_CACHE: OrderedDict[tuple[str, int], bytes] = OrderedDict()
+_ICS_CACHE_MAXSIZE = 8
+_ICS_CACHE_LOCK = threading.Lock()
+
+
+def _ics_cache_get(key: tuple[str, int]) -> bytes | None:
+    with _ICS_CACHE_LOCK:
+        body = _ICS_CACHE.get(key)
+        if body is not None:
+            _ICS_CACHE.move_to_end(key)
+        return body
+
+
+def _ics_cache_put(key: tuple[str, int], body: bytes) -> None:
+    with _ICS_CACHE_LOCK:
+        _ICS_CACHE[key] = body
+        _ICS_CACHE.move_to_end(key)
+        while len(_ICS_CACHE) > _ICS_CACHE_MAXSIZE:
+            _ICS_CACHE.popitem(last=False)
+
+
+# Liveness probes hit /api/health every second or so per instance; a recent success is
+# good enough, so only touch the pool once per TTL window.
+_HEALTH_TTL_SECONDS = 2.0
+_health_ok_at = float("-inf")
+_HEALTH_LOCK = threading.Lock()
+
+
+def _check_db_health() -> None:
+    global _health_ok_at
+    if time.monotonic() - _health_ok_at < _HEALTH_TTL_SECONDS:
+        return
+    with _HEALTH_LOCK:
+        # Another probe may have refreshed it while we waited.
+        if time.monotonic() - _health_ok_at < _HEALTH_TTL_SECONDS:
+            return
+        with get_engine().connect() as conn:
+            conn.exec_driver_sql("select 1")
+        _health_ok_at = time.monotonic()
+
+
+def _json_response(data: Any, status: int = 200) -> Response:
+    # orjson encodes in C straight to bytes; much faster than jsonify for large event lists.
+    return Response(json_dumps(data), status=status, mimetype="application/json")
+
+
+def _commit_and_bump_feed_version(session: Session) -> None:
+    session.commit()
+    # After the commit, never before: see FEED_VERSION. Runs in a new transaction that only
+    # holds the (non-transactional) nextval, so closing the session without commit is fine.
+    session.execute(select(FEED_VERSION.next_value()))
+
+
+def _iter_calendar_ics_cached(etag: str, limit: int, dtstamp: datetime) -> Iterator[bytes]:
+    """
+    Stream the ICS feed straight from a server-side cursor, then cache the full body
+    once the last chunk has been produced (an aborted download caches nothing).
+    """
+    chunks: list[bytes] = []
+    with get_session() as session:
+        rows = session.connection().execute(
+            select(*_ICS_COLS)
+            .order_by(CalendarEvent.start_at.asc().nullslast(), CalendarEvent.created_at.desc())
+            .limit(limit)
+            .execution_options(yield_per=500)
+        )
+        now = datetime.now(UTC)
+        events = (calendar_event_to_ics_event(r, now=now, dtstamp=dtstamp) for r in rows)
+        for chunk in iter_calendar_ics(events):
+            chunks.append(chunk)
+            yield chunk
+    _ics_cache_put((etag, limit), b"".join(chunks))
 
 
 def create_app() -> Flask:
     app = Flask(__name__)
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-only")
 
+    @app.errorhandler(IntegrityError)
+    def integrity_error(exc: IntegrityError):
+        # e.g. a duplicate ical_uid; anything else is still a server error.
+        if isinstance(exc.orig, UniqueViolation):
+            return _json_response({"error": "conflict"}, 409)
+        raise exc
+
+    @app.errorhandler(msgspec.ValidationError)
+    def validation_error(exc: msgspec.ValidationError):
+        # A known field with the wrong type, e.g. "start_at": "tomorrow"; the message names the field.
+        return _json_response({"error": "invalid_payload", "detail": str(exc)}, 400)
+
     @app.get("/")
     def index():
         return render_template("index.html")
 
     @app.get("/api/health")
     def health():
-        # Force DB connectivity check
-        with get_engine().connect() as conn:
-            conn.exec_driver_sql("select 1")
-        return jsonify({"ok": True})
+        # DB connectivity check (failures are never cached)
+        _check_db_health()
+        return _json_response({"ok": True})
 
     @app.get("/api/events")
     def list_events():
         with get_session() as session:
-            events = (
-                session.query(CalendarEvent)
-                .order_by(CalendarEvent.start_at.asc().nullslast(), CalendarEvent.created_at.desc())
-                .limit(200)
-                .all()
+            events = CalendarEvent.dump_query_rows(
+                session,
+                order_by=(CalendarEvent.start_at.asc().nullslast(), CalendarEvent.created_at.desc()),
+                limit=200,
             )
-            return jsonify([e.to_dict() for e in events])
+        return _json_response(events)
 
     @app.get("/calendar.ics")
     def public_calendar_ics():
@@ -59,19 +174,20 @@ def create_app() -> Flask:
         limit = request.args.get("limit", default=2000, type=int)
         limit = max(1, min(limit, 10000))
         with get_session() as session:
-            rows = (
-                session.query(CalendarEvent)
-                .order_by(CalendarEvent.start_at.asc().nullslast(), CalendarEvent.created_at.desc())
-                .limit(limit)
-                .all()
-            )
             # Strong validators to help caches / clients detect changes.
-            newest = None
-            for r in rows:
-                if r.updated_at and (newest is None or r.updated_at > newest):
-                    newest = r.updated_at
+            # Derived from a cheap aggregate so cache hits never load event rows. updated_at is the
+            # writing transaction's start time, so a long import can commit rows older than the
+            # current max; the feed version (bumped after every API write) catches that case.
+            # count/max still cover writes made outside the API, which do not bump the version.
+            version, count, newest = session.execute(
+                select(
+                    FEED_VERSION_VALUE,
+                    func.count(CalendarEvent.id),
+                    func.max(CalendarEvent.updated_at),
+                )
+            ).one()
             newest = newest or datetime.now(UTC)
-            etag_src = f"{len(rows)}:{newest.isoformat()}".encode("utf-8")
+            etag_src = f"{version}:{count}:{newest.isoformat()}".encode("utf-8")
             etag = hashlib.sha256(etag_src).hexdigest()
 
             # Canonical URL cache-busting: if the version param is missing or stale,
@@ -91,7 +207,10 @@ def create_app() -> Flask:
             if request.headers.get("If-None-Match") == etag:
                 return Response(status=304)
 
-            ics = render_calendar_ics(calendar_event_to_ics_event(r) for r in rows)
+            ics = _ics_cache_get((etag, limit))
+            if ics is None:
+                # Rendering runs after this session is closed, as the response body is consumed.
+                ics = _iter_calendar_ics_cached(etag, limit, dtstamp=newest)
             return Response(
                 ics,
                 status=200,
@@ -111,41 +230,63 @@ def create_app() -> Flask:
     @app.post("/api/events")
     def create_event():
         payload = request.get_json(force=True, silent=False) or {}
+        values = CalendarEvent.normalize_payload(payload)
+        with get_session() as session:
+            # RETURNING hydrates the row (incl. defaults) in the same round-trip.
+            event = session.scalars(insert(CalendarEvent).values(**values).returning(CalendarEvent)).one()
+            body = event.to_json_dict()
+            _commit_and_bump_feed_version(session)
+            return _json_response(body, 201)
+
+    @app.post("/api/events/bulk")
+    def bulk_create_events():
+        payload = request.get_json(force=True, silent=False)
+        if not isinstance(payload, list) or not all(isinstance(p, dict) for p in payload):
+            return _json_response({"error": "expected_list_of_objects"}, 400)
         with get_session() as session:
-            event = CalendarEvent.from_dict(payload)
-            session.add(event)
-            session.commit()
-            session.refresh(event)
-            return jsonify(event.to_dict()), 201
+            upserted = bulk_insert_events(session, payload)
+            _commit_and_bump_feed_version(session)
+        return _json_response({"upserted": upserted}, 201)
 
     @app.get("/api/events/<event_id>")
     def get_event(event_id: str):
         with get_session() as session:
             event = session.get(CalendarEvent, event_id)
             if not event:
-                return jsonify({"error": "not_found"}), 404
-            return jsonify(event.to_dict())
+                return _json_response({"error": "not_found"}, 404)
+            return _json_response(event.to_json_dict())
 
     @app.patch("/api/events/<event_id>")
     def patch_event(event_id: str):
         payload = request.get_json(force=True, silent=False) or {}
+        values = CalendarEvent.patch_values(payload)
         with get_session() as session:
-            event = session.get(CalendarEvent, event_id)
+            if values:
+                # Single UPDATE ... RETURNING both detects a missing row and returns the new state.
+                event = session.scalars(
+                    update(CalendarEvent)
+                    .where(CalendarEvent.id == event_id)
+                    .values(**values)
+                    .returning(CalendarEvent)
+                ).one_or_none()
+            else:
+                event = session.get(CalendarEvent, event_id)
             if not event:
-                return jsonify({"error": "not_found"}), 404
-            event.apply_patch(payload)
-            session.commit()
-            session.refresh(event)
-            return jsonify(event.to_dict())
+                return _json_response({"error": "not_found"}, 404)
+            body = event.to_json_dict()
+            _commit_and_bump_feed_version(session)
+            return _json_response(body)
 
     @app.delete("/api/events/<event_id>")
     def delete_event(event_id: str):
         with get_session() as session:
-            event = session.get(CalendarEvent, event_id)
-            if not event:
-                return jsonify({"error": "not_found"}), 404
-            session.delete(event)
-            session.commit()
+            # One round-trip: no load before deleting, RETURNING tells us whether the row existed.
+            deleted = session.execute(
+                delete(CalendarEvent).where(CalendarEvent.id == event_id).returning(CalendarEvent.id)
+            ).first()
+            if not deleted:
+                return _json_response({"error": "not_found"}, 404)
+            _commit_and_bump_feed_version(session)
             return "", 204
 
     return app
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable
+
+from psycopg.types.json import Jsonb
+from sqlalchemy import column, select, table
+from sqlalchemy.dialects.postgresql import JSONB, Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from src.models import CalendarEvent
+
+# Below this many rows the staging-table setup costs more than COPY saves.
+COPY_THRESHOLD = 100
+
+_TABLE = CalendarEvent.__table__
+# Columns with a server default (created_at/updated_at) are left out so Postgres stamps them.
+_INSERT_COLS = tuple(c for c in _TABLE.columns if c.server_default is None)
+_COLUMNS = tuple(c.name for c in _INSERT_COLS)
+_JSONB_COLUMNS = frozenset(c.name for c in _TABLE.columns if isinstance(c.type, JSONB))
+# A re-imported event keeps its id and created_at; everything else comes from the new payload
+# (updated_at via EXCLUDED, which carries the insert's default).
+_UPSERT_COLUMNS = tuple(c.name for c in _TABLE.columns if c.name not in ("id", "created_at"))
+_STAGE_TABLE = "calendar_events_stage"
+_STAGE = table(_STAGE_TABLE, *(column(c) for c in _COLUMNS))
+
+
+def _row_values(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Normalized values for every inserted column, with the model's Python-side defaults filled in
+    (COPY bypasses SQLAlchemy, and uniform rows keep the multi-row INSERT to one statement shape).
+    """
+    values = CalendarEvent.normalize_payload(payload)
+    row: dict[str, Any] = {}
+    for col in _INSERT_COLS:
+        if col.name in values:
+            row[col.name] = values[col.name]
+        elif col.default is not None:
+            # SQLAlchemy wraps callable defaults to take an execution context; none of ours use it.
+            row[col.name] = col.default.arg(None) if col.default.is_callable else col.default.arg
+        else:
+            row[col.name] = None
+    return row
+
+
+def _is_synced(row: dict[str, Any]) -> bool:
+    # Mirrors the (provider, external_id) unique index; a NULL provider never conflicts there.
+    return row["provider"] is not None and row["external_id"] is not None
+
+
+def _last_per_key(rows: list[dict[str, Any]], key: Callable[[dict[str, Any]], Any]) -> list[dict[str, Any]]:
+    # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement; last one wins.
+    by_key: dict[Any, dict[str, Any]] = {}
+    out: list[dict[str, Any]] = []
+    for row in rows:
+        k = key(row)
+        if k is None:
+            out.append(row)
+        else:
+            by_key[k] = row
+    out.extend(by_key.values())
+    return out
+
+
+def _upsert(stmt: Insert, synced: bool) -> Insert:
+    # One arbiter per statement: provider-synced rows match on their provider event id,
+    # everything else on ical_uid. Both are partial unique indexes, hence index_where.
+    if synced:
+        index_elements = [_TABLE.c.provider, _TABLE.c.external_id]
+        index_where = _TABLE.c.external_id.is_not(None)
+    else:
+        index_elements = [_TABLE.c.ical_uid]
+        index_where = _TABLE.c.ical_uid.is_not(None) & _TABLE.c.external_id.is_(None)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        index_where=index_where,
+        set_={c: stmt.excluded[c] for c in _UPSERT_COLUMNS},
+    )
+
+
+def _insert_values(session: Session, rows: list[dict[str, Any]], synced: bool) -> int:
+    # executemany batches into multi-row INSERT ... VALUES statements (insertmanyvalues).
+    stmt = _upsert(pg_insert(_TABLE), synced).returning(_TABLE.c.id)
+    return len(session.execute(stmt, rows).all())
+
+
+def _copy_values(session: Session, rows: list[dict[str, Any]]) -> int:
+    # COPY into a temp table, then INSERT ... SELECT so the upserts still apply.
+    conn = session.connection()
+    cols = ", ".join(_COLUMNS)
+    # Defaults included: LIKE copies NOT NULL, and the timestamps are not in the COPY.
+    conn.exec_driver_sql(f"CREATE TEMP TABLE {_STAGE_TABLE} (LIKE calendar_events INCLUDING DEFAULTS)")
+    with conn.connection.cursor() as cursor:
+        with cursor.copy(f"COPY {_STAGE_TABLE} ({cols}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(
+                    tuple(
+                        Jsonb(row[c]) if c in _JSONB_COLUMNS and row[c] is not None else row[c]
+                        for c in _COLUMNS
+                    )
+                )
+    synced = _STAGE.c.provider.is_not(None) & _STAGE.c.external_id.is_not(None)
+    upserted = 0
+    for is_synced, where in ((True, synced), (False, ~synced)):
+        result = conn.execute(
+            _upsert(pg_insert(_TABLE).from_select(_COLUMNS, select(_STAGE).where(where)), is_synced),
+            execution_options={"preserve_rowcount": True},
+        )
+        upserted += result.rowcount
+    conn.exec_driver_sql(f"DROP TABLE {_STAGE_TABLE}")
+    return upserted
+
+
+def bulk_insert_events(session: Session, payloads: Iterable[dict[str, Any]]) -> int:
+    """
+    Insert many API payloads in one go, updating existing events that share a
+    (`provider`, `external_id`) or, for events without an `external_id`, an `ical_uid`;
+    returns the number of rows inserted or updated. Does not commit.
+    """
+    rows = [_row_values(p) for p in payloads]
+    synced = _last_per_key([r for r in rows if _is_synced(r)], lambda r: (r["provider"], r["external_id"]))
+    # Only rows without an external_id are unique on ical_uid (see ix_calendar_events_ical_uid).
+    local = _last_per_key(
+        [r for r in rows if not _is_synced(r)], lambda r: r["ical_uid"] if r["external_id"] is None else None
+    )
+    if len(synced) + len(local) > COPY_THRESHOLD:
+        return _copy_values(session, synced + local)
+    upserted = 0
+    for is_synced, part in ((True, synced), (False, local)):
+        if part:
+            upserted += _insert_values(session, part, is_synced)
+    return upserted
@@ -1,7 +1,14 @@
+import json
 import os
+import re
+import threading
+import uuid
 from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any
 
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 
@@ -34,23 +41,97 @@ def get_database_url() -> str:
     return _normalize_database_url(url)
 
 
+# orjson only handles 64-bit integers: it raises on larger ones when encoding and decodes them as
+# floats. Forwarded provider blobs occasionally carry such numbers, which stdlib json round-trips
+# exactly, so both directions fall back to it for those (rare) documents.
+_LONG_NUMBER = re.compile(rb"\d{19}").search
+
+
+def _json_default(obj: Any) -> Any:
+    # The non-JSON types orjson encodes natively that API responses contain.
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def json_dumps(obj: Any) -> bytes:
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        # Same compact UTF-8 output as orjson.
+        return json.dumps(obj, default=_json_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_loads(data: bytes) -> Any:
+    # 19+ digit runs may be an integer past 64 bits (or a long decimal, which stdlib reads the same).
+    if _LONG_NUMBER(data):
+        return json.loads(data)
+    return orjson.loads(data)
+
+
 _ENGINE = None
 _SessionLocal = None
+_INIT_LOCK = threading.Lock()
 
 
-def get_engine():
+def _prepare_threshold() -> int | None:
+    # psycopg's own default is 5; "none" disables server-side prepared statements entirely.
+    value = os.environ.get("DB_PREPARE_THRESHOLD", "5").strip().lower()
+    return None if value in ("", "none") else int(value)
+
+
+def _configure_connection(dbapi_connection, connection_record) -> None:
+    # Not accepted by psycopg.connect(); raise the per-connection prepared statement LRU (default 100).
+    dbapi_connection.prepared_max = 200
+
+
+def _init_engine() -> None:
     global _ENGINE, _SessionLocal
+    # Concurrent first requests (gthread/gevent workers) must not each build an engine and pool.
+    with _INIT_LOCK:
+        if _ENGINE is not None:
+            return
+        engine = create_engine(
+            get_database_url(),
+            pool_pre_ping=True,
+            future=True,
+            pool_size=int(os.environ.get("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "20")),
+            # Recycle before typical server/proxy idle timeouts drop the socket under us.
+            pool_recycle=1800,
+            # The psycopg dialect registers these as psycopg's JSON/JSONB loaders and dumpers,
+            # so JSONB columns decode/encode in C instead of stdlib json (see json_dumps).
+            json_serializer=json_dumps,
+            json_deserializer=json_loads,
+            connect_args={
+                # psycopg v3 prepares a query server-side once it has run this many times on a
+                # connection, so hot queries skip parse/plan. Must be disabled behind a
+                # transaction-mode pooler, which may run the next statement on another backend.
+                "prepare_threshold": _prepare_threshold(),
+                "options": f"-c statement_timeout={int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '30000'))}",
+            },
+        )
+        event.listen(engine, "connect", _configure_connection)
+        # expire_on_commit=False: objects stay readable after commit without a reload SELECT.
+        _SessionLocal = sessionmaker(
+            bind=engine, autoflush=False, autocommit=False, future=True, expire_on_commit=False
+        )
+        # Publish the engine last; it is what the unlocked fast path checks.
+        _ENGINE = engine
+
+
+def get_engine():
     if _ENGINE is None:
-        _ENGINE = create_engine(get_database_url(), pool_pre_ping=True, future=True)
-        _SessionLocal = sessionmaker(bind=_ENGINE, autoflush=False, autocommit=False, future=True)
+        _init_engine()
     return _ENGINE
 
 
 @contextmanager
 def get_session():
-    global _SessionLocal
-    if _SessionLocal is None:
-        get_engine()
+    if _ENGINE is None:
+        _init_engine()
     session = _SessionLocal()
     try:
         yield session
@@ -59,5 +140,3 @@ def get_session():
         raise
     finally:
         session.close()
-
-
@@ -1,46 +1,70 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, timedelta
-from typing import Iterable
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+
+# iCalendar TEXT escaping: backslash, semicolon, comma, newline
+# (see RFC 5545 §3.3.11)
+_ICAL_ESCAPE = str.maketrans({"\\": "\\\\", ";": r"\;", ",": r"\,", "\n": r"\n", "\r": r"\n"})
+_ICAL_NEEDS_ESCAPE = re.compile(r"[\\;,\r\n]").search
 
 
 def _escape_ical_text(value: str) -> str:
-    # iCalendar TEXT escaping: backslash, semicolon, comma, newline
-    # (see RFC 5545 §3.3.11)
-    return (
-        value.replace("\\", "\\\\")
-        .replace(";", r"\;")
-        .replace(",", r"\,")
-        .replace("\r\n", r"\n")
-        .replace("\n", r"\n")
-        .replace("\r", r"\n")
-    )
+    # Most titles/locations contain nothing to escape; skip building a copy.
+    if not _ICAL_NEEDS_ESCAPE(value):
+        return value
+    if "\r" in value:
+        # Collapse CRLF first so it becomes a single escaped newline.
+        value = value.replace("\r\n", "\n")
+    return value.translate(_ICAL_ESCAPE)
 
 
-def _fold_ical_line(line: str, limit: int = 75) -> str:
+def _fold_ical_line(line: str, limit: int = 75) -> bytes:
     """
-    Fold long lines per RFC 5545: insert CRLF + space. Limit is octets in spec;
-    we approximate by characters (OK for typical ASCII output).
+    Fold long lines per RFC 5545: insert CRLF + space so no physical line exceeds
+    `limit` octets of UTF-8, without splitting a multi-byte character.
     """
-    if len(line) <= limit:
-        return line
-    out = []
-    while len(line) > limit:
-        out.append(line[:limit])
-        line = " " + line[limit:]
-    out.append(line)
-    return "\r\n".join(out)
+    data = line.encode("utf-8")
+    n = len(data)
+    if n <= limit:
+        return data
+    parts = []
+    start = 0
+    width = limit
+    while n - start > width:
+        end = start + width
+        # Back up to a character boundary (UTF-8 continuation bytes are 0b10xxxxxx).
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end])
+        start = end
+        width = limit - 1  # continuation lines carry a leading space
+    parts.append(data[start:])
+    return b"\r\n ".join(parts)
 
 
 def _fmt_dt_utc(dt: datetime) -> str:
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=UTC)
-    return dt.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+    # Naive values are treated as UTC. Convert everything else *before* the cache lookup:
+    # same-tzinfo datetimes hash and compare ignoring `fold`, so 01:30 EDT and 01:30 EST on
+    # the fall-back date would share one entry.
+    if dt.tzinfo is not None and dt.tzinfo is not UTC:
+        dt = dt.astimezone(UTC)
+    return _fmt_utc(dt)
+
+
+# Feeds repeat the same instants a lot (bulk imports share updated_at, DTSTAMP is per feed).
+@lru_cache(maxsize=4096)
+def _fmt_utc(dt: datetime) -> str:
+    # Plain integer formatting avoids strftime's locale-aware machinery.
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}T{dt.hour:02d}{dt.minute:02d}{dt.second:02d}Z"
 
 
 def _fmt_date(d: date) -> str:
-    return d.strftime("%Y%m%d")
+    return f"{d.year:04d}{d.month:02d}{d.day:02d}"
 
 
 @dataclass(frozen=True)
@@ -61,119 +85,114 @@ class IcsEvent:
     rrule: str | None = None
 
 
+def _encode_ical_lines(lines: Iterable[str]) -> bytes:
+    return b"\r\n".join([_fold_ical_line(l) for l in lines]) + b"\r\n"
+
+
+def _vevent_lines(e: IcsEvent) -> list[str]:
+    lines = ["BEGIN:VEVENT"]
+    lines.append(f"UID:{_escape_ical_text(e.uid)}")
+    lines.append(f"DTSTAMP:{_fmt_dt_utc(e.dtstamp)}")
+    if e.created:
+        lines.append(f"CREATED:{_fmt_dt_utc(e.created)}")
+    if e.last_modified:
+        lines.append(f"LAST-MODIFIED:{_fmt_dt_utc(e.last_modified)}")
+    if e.sequence is not None:
+        lines.append(f"SEQUENCE:{int(e.sequence)}")
+
+    if isinstance(e.dtstart, date) and not isinstance(e.dtstart, datetime):
+        lines.append(f"DTSTART;VALUE=DATE:{_fmt_date(e.dtstart)}")
+    else:
+        lines.append(f"DTSTART:{_fmt_dt_utc(e.dtstart)}")
+
+    if e.dtend is not None:
+        if isinstance(e.dtend, date) and not isinstance(e.dtend, datetime):
+            lines.append(f"DTEND;VALUE=DATE:{_fmt_date(e.dtend)}")
+        else:
+            lines.append(f"DTEND:{_fmt_dt_utc(e.dtend)}")
+
+    if e.summary:
+        lines.append(f"SUMMARY:{_escape_ical_text(e.summary)}")
+    if e.description:
+        lines.append(f"DESCRIPTION:{_escape_ical_text(e.description)}")
+    if e.location:
+        lines.append(f"LOCATION:{_escape_ical_text(e.location)}")
+    if e.status:
+        lines.append(f"STATUS:{_escape_ical_text(e.status).upper()}")
+    if e.transp:
+        lines.append(f"TRANSP:{_escape_ical_text(e.transp).upper()}")
+    if e.url:
+        lines.append(f"URL:{_escape_ical_text(e.url)}")
+    if e.rrule:
+        # Expect already like "FREQ=DAILY;..." (no "RRULE:" prefix)
+        lines.append(f"RRULE:{_escape_ical_text(e.rrule)}")
+
+    lines.append("END:VEVENT")
+    return lines
+
+
+def iter_calendar_ics(
+    events: Iterable[IcsEvent],
+    *,
+    prodid: str = "-//HelpSellPossibleNow//Calendar//EN",
+    calname: str = "PossibleNow Events",
+) -> Iterator[bytes]:
+    """
+    Yield the feed as UTF-8 chunks (header, one chunk per VEVENT, footer) so callers
+    can stream it without materializing the whole calendar.
+    """
+    yield _encode_ical_lines(
+        [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{prodid}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            # Hint to clients how often to refresh when subscribed to the URL.
+            "X-PUBLISHED-TTL:PT1M",
+            # Many clients (Apple Calendar, Google Calendar import, etc.) use X-WR-CALNAME for display name.
+            f"X-WR-CALNAME:{_escape_ical_text(calname)}",
+            f"X-WR-CALDESC:{_escape_ical_text('PossibleNow Events')}",
+            # RFC 7986 NAME property is supported by some clients as well.
+            f"NAME:{_escape_ical_text(calname)}",
+        ]
+    )
+
+    for e in events:
+        yield _encode_ical_lines(_vevent_lines(e))
+
+    yield b"END:VCALENDAR\r\n"
+
+
 def render_calendar_ics(
     events: Iterable[IcsEvent],
     *,
     prodid: str = "-//HelpSellPossibleNow//Calendar//EN",
     calname: str = "PossibleNow Events",
 ) -> str:
-    lines: list[str] = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        f"PRODID:{prodid}",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
-        # Hint to clients how often to refresh when subscribed to the URL.
-        "X-PUBLISHED-TTL:PT1M",
-        # Many clients (Apple Calendar, Google Calendar import, etc.) use X-WR-CALNAME for display name.
-        f"X-WR-CALNAME:{_escape_ical_text(calname)}",
-        f"X-WR-CALDESC:{_escape_ical_text('PossibleNow Events')}",
-        # RFC 7986 NAME property is supported by some clients as well.
-        f"NAME:{_escape_ical_text(calname)}",
-    ]
+    return b"".join(iter_calendar_ics(events, prodid=prodid, calname=calname)).decode("utf-8")
 
-    for e in events:
-        lines.append("BEGIN:VEVENT")
-        lines.append(f"UID:{_escape_ical_text(e.uid)}")
-        lines.append(f"DTSTAMP:{_fmt_dt_utc(e.dtstamp)}")
-        if e.created:
-            lines.append(f"CREATED:{_fmt_dt_utc(e.created)}")
-        if e.last_modified:
-            lines.append(f"LAST-MODIFIED:{_fmt_dt_utc(e.last_modified)}")
-        if e.sequence is not None:
-            lines.append(f"SEQUENCE:{int(e.sequence)}")
-
-        if isinstance(e.dtstart, date) and not isinstance(e.dtstart, datetime):
-            lines.append(f"DTSTART;VALUE=DATE:{_fmt_date(e.dtstart)}")
-        else:
-            lines.append(f"DTSTART:{_fmt_dt_utc(e.dtstart)}")
-
-        if e.dtend is not None:
-            if isinstance(e.dtend, date) and not isinstance(e.dtend, datetime):
-                lines.append(f"DTEND;VALUE=DATE:{_fmt_date(e.dtend)}")
-            else:
-                lines.append(f"DTEND:{_fmt_dt_utc(e.dtend)}")
-
-        if e.summary:
-            lines.append(f"SUMMARY:{_escape_ical_text(e.summary)}")
-        if e.description:
-            lines.append(f"DESCRIPTION:{_escape_ical_text(e.description)}")
-        if e.location:
-            lines.append(f"LOCATION:{_escape_ical_text(e.location)}")
-        if e.status:
-            lines.append(f"STATUS:{_escape_ical_text(e.status).upper()}")
-        if e.transp:
-            lines.append(f"TRANSP:{_escape_ical_text(e.transp).upper()}")
-        if e.url:
-            lines.append(f"URL:{_escape_ical_text(e.url)}")
-        if e.rrule:
-            # Expect already like "FREQ=DAILY;..." (no "RRULE:" prefix)
-            lines.append(f"RRULE:{_escape_ical_text(e.rrule)}")
-
-        lines.append("END:VEVENT")
-
-    lines.append("END:VCALENDAR")
-    return "\r\n".join(_fold_ical_line(l) for l in lines) + "\r\n"
-
-
-def calendar_event_to_ics_event(row) -> IcsEvent:
-    """
-    Map a src.models.CalendarEvent row to an ICS event.
-    - Uses UTC date-times for DTSTART/DTEND.
-    - For all-day events, uses DTSTART/DTEND as VALUE=DATE. DTEND is exclusive.
-    """
-    uid = row.ical_uid or str(row.id)
-    created = row.created_at or datetime.now(UTC)
-    last_modified = row.updated_at or created
-    dtstamp = last_modified
+
+def _ics_sequence(last_modified: datetime) -> int | None:
     # Many clients use SEQUENCE to decide whether to apply updates for a UID.
     # Use unix epoch seconds derived from last_modified to make it monotonic-ish.
     try:
-        seq = int(last_modified.replace(tzinfo=UTC).timestamp())
+        return int(last_modified.replace(tzinfo=UTC).timestamp())
     except Exception:
-        seq = None
+        return None
 
-    if row.is_all_day and row.start_at:
-        start_d = row.start_at.date()
-        if row.end_at:
-            end_d = row.end_at.date()
-        else:
-            end_d = start_d + timedelta(days=1)
-
-        return IcsEvent(
-            uid=uid,
-            dtstamp=dtstamp,
-            created=created,
-            last_modified=last_modified,
-            sequence=seq,
-            dtstart=start_d,
-            dtend=end_d,
-            summary=row.title,
-            description=row.description,
-            location=row.location,
-            status=row.status,
-            transp=row.transparency,
-            url=row.html_link or row.web_link,
-            rrule=(row.recurrence_rules[0].removeprefix("RRULE:") if row.recurrence_rules else None),
-        )
 
+def _ics_event_timed(row, start_at: datetime | None, now: datetime | None, dtstamp: datetime | None) -> IcsEvent:
+    created = row.created_at or now or datetime.now(UTC)
+    last_modified = row.updated_at or created
+    rrules = row.recurrence_rules
     return IcsEvent(
-        uid=uid,
-        dtstamp=dtstamp,
+        uid=row.ical_uid or str(row.id),
+        dtstamp=dtstamp or last_modified,
         created=created,
         last_modified=last_modified,
-        sequence=seq,
-        dtstart=row.start_at or dtstamp,
+        sequence=_ics_sequence(last_modified),
+        dtstart=start_at or last_modified,
         dtend=row.end_at,
         summary=row.title,
         description=row.description,
@@ -181,7 +200,50 @@ def calendar_event_to_ics_event(row) -> IcsEvent:
         status=row.status,
         transp=row.transparency,
         url=row.html_link or row.web_link,
-        rrule=(row.recurrence_rules[0].removeprefix("RRULE:") if row.recurrence_rules else None),
+        rrule=rrules[0].removeprefix("RRULE:") if rrules else None,
     )
 
 
+def _ics_event_allday(row, start_at: datetime, now: datetime | None, dtstamp: datetime | None) -> IcsEvent:
+    created = row.created_at or now or datetime.now(UTC)
+    last_modified = row.updated_at or created
+    rrules = row.recurrence_rules
+    start_d = start_at.date()
+    end_at = row.end_at
+    return IcsEvent(
+        uid=row.ical_uid or str(row.id),
+        dtstamp=dtstamp or last_modified,
+        created=created,
+        last_modified=last_modified,
+        sequence=_ics_sequence(last_modified),
+        dtstart=start_d,
+        dtend=end_at.date() if end_at else start_d + timedelta(days=1),
+        summary=row.title,
+        description=row.description,
+        location=row.location,
+        status=row.status,
+        transp=row.transparency,
+        url=row.html_link or row.web_link,
+        rrule=rrules[0].removeprefix("RRULE:") if rrules else None,
+    )
+
+
+def calendar_event_to_ics_event(
+    row,
+    *,
+    now: datetime | None = None,
+    dtstamp: datetime | None = None,
+) -> IcsEvent:
+    """
+    Map a src.models.CalendarEvent row (ORM instance or Core Row of the same columns) to an ICS event.
+    - Uses UTC date-times for DTSTART/DTEND.
+    - For all-day events, uses DTSTART/DTEND as VALUE=DATE. DTEND is exclusive.
+    - `now` is the fallback for missing audit timestamps; pass one value per feed.
+    - `dtstamp` is the feed's DTSTAMP (RFC 5545: when the iCalendar object was created);
+      defaults to the event's last modification time.
+    """
+    # Each variant reads every column once; timed events are the common case.
+    start_at = row.start_at
+    if row.is_all_day and start_at:
+        return _ics_event_allday(row, start_at, now, dtstamp)
+    return _ics_event_timed(row, start_at, now, dtstamp)